@@ -0,0 +1,182 @@
+"""
+Headless daemon: audio -> engine -> injection without PyQt6.
+
+Controls:
+    SIGUSR1                 toggle dictation
+    SIGTERM / SIGINT        shut down
+    control socket          toggle | start | stop | status | profile | quit
+    Pause/Break hotkey      toggle dictation (unless --no-hotkeys)
+    Ctrl+Alt+P hotkey       30 s sampling profile of all threads
+"""
+import argparse
+import signal
+import threading
+import time
+
+from src.audio import AudioPipeline
+from src.control import ControlServer, DEFAULT_SOCKET
+from src.dsp import PreProcessor
+from src.engine import TranscriptionEngine
+from src.input import InputController, InjectionWorker
+from src.kws import KeywordSpotter
+from src.profiler import SamplingProfiler
+
+def main():
+    parser = argparse.ArgumentParser(description="Algospeak headless daemon (no GUI).")
+    parser.add_argument("--sounds", action="store_true", help="Play feedback sounds")
+    parser.add_argument("--no-hotkeys", action="store_true", help="Don't install the global keyboard hook")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Control socket path")
+    parser.add_argument("--start", action="store_true", help="Start listening immediately")
+    args = parser.parse_args()
+
+    shutdown = threading.Event()
+
+    # Initialize Components
+    audio_pipeline = AudioPipeline(preprocessor=PreProcessor.default())
+
+    # --- Integration Logic ---
+
+    def on_transcription_update(text: str, is_final: bool):
+        """
+        Callback from Engine. No overlay, so only commits matter.
+        """
+        if is_final and text:
+            print(f"Injecting: {text}")
+            # Queued: typing into a slow target app must not stall decoding
+            injector.submit(text)
+
+    def on_feedback_update(feedback_type: str):
+        if args.sounds:
+            # Imported lazily: sounds are optional and pull in the synthesizer only when wanted
+            from src.sound import SoundSynthesizer
+            SoundSynthesizer.play(feedback_type)
+
+    spotter = KeywordSpotter()
+    engine = TranscriptionEngine(
+        on_segment_callback=on_transcription_update,
+        on_feedback_callback=on_feedback_update,
+        keyword_spotter=spotter
+    )
+
+    # Dictation starts paused, so the idle clock runs from startup
+    engine.set_paused(True)
+
+    def start_recording():
+        if not audio_pipeline.is_recording:
+            # Reload an idle-evicted model before audio starts flowing
+            engine.set_paused(False)
+            audio_pipeline.start()
+            print("[LISTENING...]")
+        return "listening"
+
+    def stop_recording():
+        if audio_pipeline.is_recording:
+            audio_pipeline.stop()
+            engine.set_paused(True)
+            print("[PAUSED]")
+        return "paused"
+
+    def toggle_recording():
+        if audio_pipeline.is_recording:
+            return stop_recording()
+        return start_recording()
+
+    def status():
+        state = "listening" if audio_pipeline.is_recording else "paused"
+        if engine.model is not None:
+            model = "loaded"
+        elif engine.model_evicted:
+            if engine.reloading:
+                model = "reloading"
+            else:
+                model = "reload-failed" if engine.last_reload_error else "evicted"
+        else:
+            model = "loading"
+        reload = f" last_reload={engine.last_reload_latency:.2f}s" if engine.last_reload_latency is not None else ""
+        inject = injector.stats()
+        injected = f" inject_p95={inject['inject_ms_p95']:.0f}ms" if inject["injections"] else ""
+        return f"{state} model={model} decodes={engine.decode_count}{reload}{injected}"
+
+    def quit_app():
+        shutdown.set()
+        return "bye"
+
+    profiler = None
+
+    def start_profile():
+        nonlocal profiler
+        if profiler is not None and profiler.is_alive():
+            return "profiler already running"
+        profiler = SamplingProfiler(duration=30.0)
+        profiler.start()
+        return "profiling 30s"
+
+    input_controller = InputController(
+        on_toggle_record=toggle_recording,
+        on_kill_app=quit_app,
+        on_profile=start_profile
+    )
+    injector = InjectionWorker(input_controller.inject_text)
+
+    control = ControlServer({
+        "toggle": toggle_recording,
+        "start": start_recording,
+        "stop": stop_recording,
+        "status": status,
+        "profile": start_profile,
+        "quit": quit_app,
+    }, path=args.socket)
+
+    # Signals are delivered on the main thread, which is otherwise just waiting
+    signal.signal(signal.SIGINT, lambda *_: shutdown.set())
+    signal.signal(signal.SIGTERM, lambda *_: shutdown.set())
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: toggle_recording())
+
+    # Start Services
+    print("Starting Engine...")
+    engine.start() # Model loading happens here
+    spotter.start()
+    injector.start()
+
+    if not args.no_hotkeys:
+        print("Starting Input Controller...")
+        input_controller.start()
+
+    control.start()
+
+    # Audio Bridge Thread
+    # Reads from AudioPipeline -> Pushes to Engine
+    def audio_bridge():
+        while True:
+            chunk = audio_pipeline.get_audio_chunk()
+            if chunk is not None:
+                engine.push_audio(chunk)
+                spotter.push_audio(chunk)
+            else:
+                time.sleep(0.005) # fast poll
+
+            if not engine.running:
+                break
+
+    bridge_thread = threading.Thread(target=audio_bridge, name="AudioBridge", daemon=True)
+    bridge_thread.start()
+
+    if args.start:
+        start_recording()
+
+    print("System Ready (headless).")
+
+    while not shutdown.wait(0.5):
+        pass
+
+    print("Shutting down...")
+    control.stop()
+    input_controller.stop()
+    injector.stop()
+    spotter.stop()
+    audio_pipeline.stop()
+    engine.stop()
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,12 @@ import threading
 import time
 from PyQt6.QtWidgets import QApplication
 from src.audio import AudioPipeline
+from src.dsp import PreProcessor
 from src.engine import TranscriptionEngine
 from src.gui import SystemTrayApp, SignalHandler
-from src.input import InputController
+from src.input import InputController, InjectionWorker
+from src.kws import KeywordSpotter
+from src.profiler import SamplingProfiler
 
 def main():
     # Handle SIGINT for Ctrl+C in terminal
@@ -16,7 +19,7 @@ def main():
     app.setQuitOnLastWindowClosed(False)
 
     # Initialize Components
-    audio_pipeline = AudioPipeline() 
+    audio_pipeline = AudioPipeline(preprocessor=PreProcessor.default())
     
     # Signal Handler for GUI updates
     signal_handler = SignalHandler()
@@ -33,21 +36,30 @@ def main():
         # 2. Inject Text (Only if Final and Valid)
         if is_final and text:
             print(f"Injecting: {text}")
-            input_controller.inject_text(text)
+            # Queued: typing into a slow target app must not stall decoding
+            injector.submit(text)
 
     def on_feedback_update(feedback_type: str):
         signal_handler.trigger_feedback.emit(feedback_type)
 
+    spotter = KeywordSpotter()
     engine = TranscriptionEngine(
         on_segment_callback=on_transcription_update,
-        on_feedback_callback=on_feedback_update
+        on_feedback_callback=on_feedback_update,
+        keyword_spotter=spotter
     )
     
+    # Dictation starts paused, so the idle clock runs from startup
+    engine.set_paused(True)
+
     def toggle_recording():
         if audio_pipeline.is_recording:
             audio_pipeline.stop()
+            engine.set_paused(True)
             signal_handler.update_text.emit("[PAUSED]", True)
         else:
+            # Reload an idle-evicted model before audio starts flowing
+            engine.set_paused(False)
             audio_pipeline.start()
             # We don't want to emit "True" here as it's not a committed text, just a status update.
             # But our GUI expects text, is_final. 
@@ -59,28 +71,50 @@ def main():
         cleanup()
         sys.exit(0)
 
+    profiler = None
+
+    def start_profile():
+        # Reachable from both the tray (Qt thread) and the hotkey (listener thread)
+        nonlocal profiler
+        if profiler is not None and profiler.is_alive():
+            signal_handler.notify.emit("Profiler already running.")
+            return
+        profiler = SamplingProfiler(
+            duration=30.0,
+            on_done=lambda path: signal_handler.notify.emit(f"Profile written to {path}")
+        )
+        profiler.start()
+        signal_handler.notify.emit("Profiling all threads for 30s...")
+
     input_controller = InputController(
         on_toggle_record=toggle_recording,
-        on_kill_app=kill_app
+        on_kill_app=kill_app,
+        on_profile=start_profile
     )
+    injector = InjectionWorker(input_controller.inject_text)
 
     # Cleanup Routine
     def cleanup():
         print("Shutting down...")
         input_controller.stop()
+        injector.stop()
+        spotter.stop()
         audio_pipeline.stop()
         engine.stop()
         
-    tray_app = SystemTrayApp(app, on_quit=cleanup)
+    tray_app = SystemTrayApp(app, on_quit=cleanup, on_profile=start_profile)
     
     # Connect signals
     # map signal_handler.update_text -> tray_app.overlay.update_text
     signal_handler.update_text.connect(tray_app.overlay.update_text)
     signal_handler.trigger_feedback.connect(tray_app.overlay.handle_feedback)
+    signal_handler.notify.connect(tray_app.notify)
 
     # Start Services
     print("Starting Engine...")
     engine.start() # Model loading happens here
+    spotter.start()
+    injector.start()
     
     print("Starting Input Controller...")
     input_controller.start()
@@ -91,15 +125,16 @@ def main():
         while True:
             chunk = audio_pipeline.get_audio_chunk()
             if chunk is not None:
-                # Push to engine
+                # Push to engine, and to the spotter on its own thread
                 engine.push_audio(chunk)
+                spotter.push_audio(chunk)
             else:
                 time.sleep(0.005) # fast poll
             
             if not engine.running:
                 break
     
-    bridge_thread = threading.Thread(target=audio_bridge, daemon=True)
+    bridge_thread = threading.Thread(target=audio_bridge, name="AudioBridge", daemon=True)
     bridge_thread.start()
 
     print("System Ready. Press Pause/Break to start/stop dictation.")
@@ -7,11 +7,19 @@ from typing import Optional, Tuple
 import numpy as np
 import sounddevice as sd
 
+from src.dsp import PreProcessor
+
+# Queued by reset_preprocessor(): the consumer resets DSP state when it gets here
+_RESET = object()
+
 class AudioPipeline:
-    def __init__(self, sample_rate: int = 16000, block_size: int = 1024, channels: int = 1):
+    def __init__(self, sample_rate: int = 16000, block_size: int = 1024, channels: int = 1,
+                 preprocessor: Optional[PreProcessor] = None):
         self.sample_rate = sample_rate
         self.block_size = block_size
         self.channels = channels
+        # DSP runs on the consumer side so the PortAudio callback stays cheap
+        self.preprocessor = preprocessor
         self.audio_queue = queue.Queue()
         self.is_recording = False
         self.stream: Optional[sd.InputStream] = None
@@ -40,6 +48,8 @@ class AudioPipeline:
                         dtype="float32",
                         callback=self._callback
                     )
+                    # Filter state from before a pause doesn't belong to this stream
+                    self.reset_preprocessor()
                     self.stream.start()
                     self.is_recording = True
                     print("Audio pipeline started.")
@@ -56,17 +66,35 @@ class AudioPipeline:
                 self.stream = None
                 print("Audio pipeline stopped.")
 
+    def reset_preprocessor(self):
+        """
+        Resets DSP state from any thread. The reset is queued behind the audio
+        already captured, and applied by the consumer (get_audio_chunk) between
+        chunks, so it never races process() and older chunks keep their state.
+        """
+        if self.preprocessor:
+            self.audio_queue.put(_RESET)
+
     def get_audio_chunk(self) -> Optional[np.ndarray]:
         """
-        Retrieves the next audio chunk from the queue.
-        Non-blocking, returns None if empty.
+        Retrieves the next audio chunk from the queue, pre-processed if a
+        preprocessor is configured. Non-blocking, returns None if empty.
         """
         try:
-            return self.audio_queue.get_nowait()
+            chunk = self.audio_queue.get_nowait()
+            while chunk is _RESET:
+                self.preprocessor.reset()
+                chunk = self.audio_queue.get_nowait()
         except queue.Empty:
             return None
+        if self.preprocessor:
+            chunk = self.preprocessor.process(chunk)
+        return chunk
 
     def clear_queue(self):
         """Clears the audio queue."""
         with self.audio_queue.mutex:
+            pending_reset = any(chunk is _RESET for chunk in self.audio_queue.queue)
             self.audio_queue.queue.clear()
+            if pending_reset:
+                self.audio_queue.queue.append(_RESET)
@@ -0,0 +1,117 @@
+import getpass
+import hmac
+import os
+import secrets
+import socket
+import sys
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+
+def _user_tag() -> str:
+    return str(os.getuid()) if hasattr(os, "getuid") else getpass.getuser()
+
+
+# Per-user: without XDG_RUNTIME_DIR this lands in a temp dir other users share
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+                              f"algospeak-{_user_tag()}.sock")
+
+
+class ControlServer(threading.Thread):
+    """
+    Line-based local control socket for the headless daemon.
+    Each connection sends one command ("toggle", "status", ...) and gets one
+    line back. Uses a Unix socket (mode 0600) where available.
+
+        echo toggle | nc -U $XDG_RUNTIME_DIR/algospeak-$(id -u).sock
+
+    Without AF_UNIX (Windows) it listens on an ephemeral localhost TCP port,
+    which any local user can reach. The port and a random token are written
+    to `<path>.port` (readable only by the owner), and every command must be
+    prefixed with the token: "<token> toggle".
+    """
+    def __init__(self,
+                 handlers: Dict[str, Callable[[], str]],
+                 path: str = DEFAULT_SOCKET,
+                 timeout: float = 2.0):  # Per connection: a silent client must not block "quit"
+        super().__init__(daemon=True)
+        self.handlers = handlers
+        self.path = path
+        self.timeout = timeout
+        self.token: Optional[str] = None  # TCP only
+        self.running = True
+        self.sock: Optional[socket.socket] = None
+
+    @property
+    def port_file(self) -> str:
+        return self.path + ".port"
+
+    def _bind(self):
+        if hasattr(socket, "AF_UNIX"):
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # Stale socket from a previous run
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            print(f"Control socket: {self.path}")
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.bind(("127.0.0.1", 0))
+            port = self.sock.getsockname()[1]
+            self.token = secrets.token_hex(16)
+            fd = os.open(self.port_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{port} {self.token}\n")
+            print(f"Control socket: 127.0.0.1:{port} (port and token in {self.port_file})")
+        self.sock.listen(4)
+
+    def _parse(self, line: str) -> Optional[str]:
+        """Returns the command, or None if the TCP token is missing or wrong."""
+        if self.token is None:
+            return line.lower()
+        token, _, command = line.partition(" ")
+        if not hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            return None
+        return command.strip().lower()
+
+    def run(self):
+        try:
+            self._bind()
+        except OSError as e:
+            print(f"Control socket error: {e}", file=sys.stderr)
+            return
+
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break  # Closed by stop()
+            with conn:
+                try:
+                    conn.settimeout(self.timeout)
+                    command = self._parse(conn.recv(256).decode("utf-8", "replace").strip())
+                    handler = self.handlers.get(command) if command is not None else None
+                    if command is None:
+                        reply = "unauthorized"
+                    elif handler:
+                        reply = handler() or "ok"
+                    else:
+                        reply = f"unknown command, expected one of: {', '.join(sorted(self.handlers))}"
+                    conn.sendall((reply + "\n").encode("utf-8"))
+                except Exception as e:
+                    print(f"Control command error: {e}", file=sys.stderr)
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            try:
+                # close() alone doesn't wake a blocked accept() on Linux
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+            if self.sock.family == getattr(socket, "AF_UNIX", None) and os.path.exists(self.path):
+                os.unlink(self.path)
+            if self.token is not None and os.path.exists(self.port_file):
+                os.unlink(self.port_file)
@@ -0,0 +1,226 @@
+import collections
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+class DCBlocker:
+    """
+    One-pole high-pass filter: y[n] = x[n] - x[n-1] + r * y[n-1].
+    Removes DC offset and low rumble (fans, desk thumps) below `cutoff_hz`.
+    """
+    # The recursion is solved in closed form per sub-block so it stays vectorized.
+    # Sub-blocks keep r^-n well conditioned.
+    SUB_BLOCK = 256
+
+    def __init__(self, sample_rate: int = 16000, cutoff_hz: float = 80.0):
+        self.r = float(np.exp(-2 * np.pi * cutoff_hz / sample_rate))
+        n = np.arange(self.SUB_BLOCK, dtype=np.float64)
+        self._pow = self.r ** n
+        self._inv_pow = 1.0 / self._pow
+        self.reset()
+
+    def reset(self):
+        self.prev_x = 0.0
+        self.prev_y = 0.0
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        if len(x) == 0:
+            return x
+        x = x.astype(np.float64)
+        d = np.diff(x, prepend=self.prev_x)
+        y = np.empty_like(d)
+
+        for start in range(0, len(d), self.SUB_BLOCK):
+            seg = d[start:start + self.SUB_BLOCK]
+            n = len(seg)
+            pw = self._pow[:n]
+            y[start:start + n] = pw * (self.r * self.prev_y + np.cumsum(seg * self._inv_pow[:n]))
+            self.prev_y = y[start + n - 1]
+
+        self.prev_x = x[-1]
+        return y.astype(np.float32)
+
+
+class SpectralGate:
+    """
+    Streaming spectral-gating noise suppressor.
+    Tracks a per-bin noise floor (averaged over bins that look like noise, slow
+    rise otherwise) and attenuates bins that don't rise above it.
+    Uses sqrt-Hann WOLA so unity gain reconstructs exactly.
+    Adds `frame_size - hop` samples of latency (16 ms at defaults).
+    """
+    def __init__(self,
+                 frame_size: int = 512,
+                 threshold: float = 2.0,       # Bin must exceed noise floor by this factor
+                 floor_gain: float = 0.1,      # Max attenuation (-20 dB)
+                 noise_rise: float = 0.995,    # Slow adaptation for bins that look like speech
+                 noise_track: float = 0.9,     # Normal adaptation for bins that look like noise
+                 speech_ratio: float = 4.0,    # Bin above floor * this counts as speech
+                 smoothing: float = 0.5):      # Gain smoothing across frames (reduces musical noise)
+        self.frame_size = frame_size
+        self.hop = frame_size // 2
+        self.threshold = threshold
+        self.floor_gain = floor_gain
+        self.noise_rise = noise_rise
+        self.noise_track = noise_track
+        self.speech_ratio = speech_ratio
+        self.smoothing = smoothing
+        self.window = np.sqrt(np.hanning(frame_size + 1)[:-1]).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        bins = self.frame_size // 2 + 1
+        self.in_buf = np.zeros(self.frame_size - self.hop, dtype=np.float32)
+        self.out_tail = np.zeros(self.frame_size - self.hop, dtype=np.float32)
+        self.noise_psd: Optional[np.ndarray] = None
+        self.prev_gain = np.ones(bins, dtype=np.float32)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        buf = np.concatenate((self.in_buf, x.astype(np.float32)))
+        n_frames = (len(buf) - self.frame_size) // self.hop + 1
+        if n_frames <= 0:
+            self.in_buf = buf
+            return np.array([], dtype=np.float32)
+
+        # Frame everything at once: (n_frames, frame_size)
+        idx = np.arange(self.frame_size)[None, :] + self.hop * np.arange(n_frames)[:, None]
+        spec = np.fft.rfft(buf[idx] * self.window, axis=1)
+        power = spec.real ** 2 + spec.imag ** 2
+
+        # Noise tracking is recursive across frames, vectorized across bins
+        gains = np.empty_like(power, dtype=np.float32)
+        for f in range(n_frames):
+            p = power[f]
+            if self.noise_psd is None:
+                self.noise_psd = p.copy()
+            coef = np.where(p > self.speech_ratio * self.noise_psd, self.noise_rise, self.noise_track)
+            self.noise_psd = coef * self.noise_psd + (1 - coef) * p
+
+            g = 1.0 - self.threshold * self.noise_psd / np.maximum(p, 1e-12)
+            g = np.clip(g, self.floor_gain, 1.0)
+            g = self.smoothing * self.prev_gain + (1 - self.smoothing) * g
+            self.prev_gain = g
+            gains[f] = g
+
+        frames = np.fft.irfft(spec * gains, n=self.frame_size, axis=1).astype(np.float32) * self.window
+
+        # Overlap-add
+        out = np.zeros(n_frames * self.hop + self.frame_size - self.hop, dtype=np.float32)
+        out[:len(self.out_tail)] += self.out_tail
+        for f in range(n_frames):
+            out[f * self.hop:f * self.hop + self.frame_size] += frames[f]
+
+        consumed = n_frames * self.hop
+        self.in_buf = buf[consumed:]
+        self.out_tail = out[consumed:]
+        return out[:consumed]
+
+
+class AutomaticGainControl:
+    """
+    Block-level AGC. Pulls speech towards `target_rms` with fast attack and
+    slow release. Blocks that aren't clearly above the tracked noise level are
+    never boosted, so silence stays silence instead of becoming amplified hiss
+    for Whisper to "hear".
+    """
+    def __init__(self,
+                 target_rms: float = 0.05,
+                 max_gain: float = 10.0,
+                 min_gain: float = 0.1,
+                 noise_gate: float = 0.002,    # Absolute level below which nothing is boosted
+                 speech_ratio: float = 3.0,    # Block must exceed tracked noise by this factor
+                 attack: float = 0.5,
+                 release: float = 0.05):
+        self.target_rms = target_rms
+        self.max_gain = max_gain
+        self.min_gain = min_gain
+        self.noise_gate = noise_gate
+        self.speech_ratio = speech_ratio
+        self.attack = attack
+        self.release = release
+        self.reset()
+
+    def reset(self):
+        self.gain = 1.0
+        self.noise_rms: Optional[float] = None
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        if len(x) == 0:
+            return x
+        rms = float(np.sqrt(np.mean(x * x)))
+
+        # Minimum-follow noise tracker: falls quickly, creeps up slowly
+        if self.noise_rms is None or rms < self.noise_rms:
+            self.noise_rms = rms if self.noise_rms is None else 0.7 * self.noise_rms + 0.3 * rms
+        else:
+            self.noise_rms = min(self.noise_rms * 1.01, rms)
+
+        if rms > max(self.noise_gate, self.speech_ratio * self.noise_rms):
+            desired = float(np.clip(self.target_rms / rms, self.min_gain, self.max_gain))
+        else:
+            desired = min(self.gain, 1.0)
+
+        # Attack when gain must drop (loud input), release when it may rise
+        rate = self.attack if desired < self.gain else self.release
+        new_gain = self.gain + rate * (desired - self.gain)
+
+        # Ramp across the block to avoid zipper noise
+        ramp = np.linspace(self.gain, new_gain, len(x), dtype=np.float32)
+        self.gain = new_gain
+        return np.clip(x * ramp, -1.0, 1.0)
+
+
+class PreProcessor:
+    """
+    Chain of streaming DSP stages applied between capture and the engine.
+    Each stage exposes `process(np.ndarray) -> np.ndarray` and `reset()`.
+    Records the wall-clock cost of every block.
+    """
+    def __init__(self, stages: List, sample_rate: int = 16000, history: int = 1000):
+        self.stages = stages
+        self.sample_rate = sample_rate
+        self.block_costs = collections.deque(maxlen=history)  # (seconds spent, samples in)
+
+    @classmethod
+    def default(cls, sample_rate: int = 16000) -> "PreProcessor":
+        return cls([
+            DCBlocker(sample_rate),
+            SpectralGate(),
+            AutomaticGainControl(),
+        ], sample_rate=sample_rate)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+
+        # Downmix to mono
+        if block.ndim > 1:
+            block = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+
+        out = block.astype(np.float32, copy=False)
+        for stage in self.stages:
+            out = stage.process(out)
+
+        self.block_costs.append((time.perf_counter() - start, len(block)))
+        return out
+
+    def stats(self) -> dict:
+        """
+        Per-block cost summary. `rtf` is processing time / audio time.
+        """
+        if not self.block_costs:
+            return {"blocks": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "rtf": 0.0}
+        costs = np.array([c for c, _ in self.block_costs])
+        samples = sum(n for _, n in self.block_costs)
+        return {
+            "blocks": len(costs),
+            "mean_ms": float(costs.mean() * 1000),
+            "p95_ms": float(np.percentile(costs, 95) * 1000),
+            "max_ms": float(costs.max() * 1000),
+            "rtf": float(costs.sum() / max(samples / self.sample_rate, 1e-9)),
+        }
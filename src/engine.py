@@ -1,25 +1,39 @@
+import gc
 import os
 import threading
 import time
 import queue
+import re
 import collections
 import numpy as np
 from typing import Optional, Callable, Tuple
 from faster_whisper import WhisperModel
 
+from src.kws import KeywordSpotter
+
+WORD_PATTERN = re.compile(r"\s*\S+")
+PUNCTUATION = str.maketrans('', '', '.,!?')
+
 class TranscriptionEngine(threading.Thread):
+    FEEDBACK = {"INJECT": "SUCCESS", "CUT": "DELETE", "CLEAR": "DELETE"}
+
     def __init__(self, 
                  model_size: str = "large-v3-turbo", 
                  device: str = "auto", 
                  compute_type: str = "default",
                  on_segment_callback: Optional[Callable[[str, bool], None]] = None,
-                 on_feedback_callback: Optional[Callable[[str], None]] = None): # New callback
-        super().__init__()
+                 on_feedback_callback: Optional[Callable[[str], None]] = None, # New callback
+                 keyword_spotter: Optional[KeywordSpotter] = None):
+        super().__init__(name="TranscriptionEngine")
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
         self.on_segment_callback = on_segment_callback
         self.on_feedback_callback = on_feedback_callback
+        self.keyword_spotter = keyword_spotter
+        if keyword_spotter and keyword_spotter.on_spotted is None:
+            # Posted from the spotter's own thread
+            keyword_spotter.on_spotted = self._on_spotted
         
         self.audio_queue = queue.Queue()
         self.running = True
@@ -32,14 +46,17 @@ class TranscriptionEngine(threading.Thread):
         # VAD & Commit Config
         self.vad_threshold = 0.008      # Slightly lowered to be more sensitive to soft speech
         self.buffer_energy = 0.0        # Energy of current buffer
+        self.has_speech = False         # Any ingested chunk above vad_threshold since last clear
+        self.pre_roll = 0.5             # Seconds of silence kept ahead of speech onset
         self.silence_duration = 0.0    
         self.min_silence_to_commit = 0.8
         
         # Hallucination Filters
-        self.min_logprob = -0.8        # Discard if confidence < 45% approx
-        self.min_no_speech_prob = 0.4  # Discard if model thinks probability of no speech is high? 
-                                       # Actually `no_speech_prob` > 0.6 means "likely silence".
-                                       # Faster-whisper returns info.no_speech_prob.
+        self.min_logprob = -0.8        # Discard segment if avg_logprob is below this (confidence < 45% approx)
+        self.min_no_speech_prob = 0.4  # Used only to classify rejections: a segment already dropped by min_logprob
+                                       # counts as silence if no_speech_prob is also above this (faster-whisper's
+                                       # rule). It never rejects on its own: that drops real speech, especially
+                                       # with the silent pre-roll ahead of every utterance.
         self.banned_phrases = {
             "thank you", "thanks", "you", "subs by", "subtitle", "copyright", "caption"
         }
@@ -51,8 +68,38 @@ class TranscriptionEngine(threading.Thread):
         
         # State
         self.last_partial_text = ""
+        self.spotted_command: Optional[str] = None  # Command fired early by the keyword spotter
+        self.force_process = False                  # Decode on the next loop instead of waiting an interval
 
-    def initialize_model(self):
+        # Idle Eviction
+        self.idle_unload_after: Optional[float] = 600.0  # Seconds paused before the model is released (None = never)
+        self.model = None
+        self.paused_since: Optional[float] = None
+        self.model_evicted = False
+        self.reloading = False
+        self._model_lock = threading.Lock()
+        self.last_reload_latency: Optional[float] = None  # Seconds from resume to model ready
+        self.reload_attempts = 3        # Tries per resume before giving up until the next one
+        self.reload_retry_delay = 5.0   # Seconds between tries (a shared GPU may free memory)
+        self.last_reload_error: Optional[str] = None
+
+        # Counters (read by tools/replay.py)
+        self.decode_count = 0
+        self.skipped_decode_count = 0   # Intervals skipped because the buffer held no speech
+        self.banned_word_count = 0      # Words dropped by banned_phrases
+        self.rejected_segment_count = 0 # Segments dropped by min_logprob
+        self.no_speech_segment_count = 0 # ...of which also crossed min_no_speech_prob (silence)
+        self.aligned_decode_count = 0   # Decodes that paid for word timestamps
+        # (seconds, samples) per _transcribe call, split by word_timestamps
+        self.decode_costs = {False: collections.deque(maxlen=1000), True: collections.deque(maxlen=1000)}
+
+    def _load_model(self, fallback: bool = True) -> WhisperModel:
+        """
+        Builds and warms up the main model. Returns it instead of assigning it
+        so a background reload can swap it in atomically.
+        With `fallback`, a failed load drops to CPU int8 for the rest of the
+        session; without it, the error propagates and the configured device is kept.
+        """
         print(f"Loading model {self.model_size} on {self.device}...")
         try:
             if self.compute_type == "default":
@@ -61,18 +108,26 @@ class TranscriptionEngine(threading.Thread):
                 else:
                     self.compute_type = "int8"
 
-            self.model = WhisperModel(
+            model = WhisperModel(
                 self.model_size, 
                 device=self.device, 
                 compute_type=self.compute_type
             )
             # Warmup
-            self.model.transcribe(np.zeros(16000), beam_size=1)
+            model.transcribe(np.zeros(16000), beam_size=1)
             print("Model loaded.")
         except Exception as e:
+            if not fallback:
+                raise
             print(f"Error loading model: {e}")
             self.device = "cpu"
-            self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+            self.compute_type = "int8"
+            model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+            print("Model loaded.")
+        return model
+
+    def initialize_model(self):
+        self.model = self._load_model()
 
     def _check_cuda(self):
         try:
@@ -88,6 +143,11 @@ class TranscriptionEngine(threading.Thread):
         self.initialize_model()
         
         while self.running:
+            # Read before draining: the bridge queues audio here before the spotter
+            # sees it, so a forced decode always includes the spotted command
+            force_process = self.force_process
+            self.force_process = False
+
             # 1. Ingest
             try:
                 chunks = []
@@ -103,7 +163,7 @@ class TranscriptionEngine(threading.Thread):
                     if new_data.ndim > 1:
                         new_data = new_data.flatten()
                     
-                    self.audio_buffer = np.concatenate((self.audio_buffer, new_data))
+                    self.ingest(new_data)
                 else:
                     time.sleep(0.01)
 
@@ -112,38 +172,219 @@ class TranscriptionEngine(threading.Thread):
             
             # 2. Process
             now = time.time()
-            if now - self.last_process_time > self.transcription_interval:
-                # Only process if buffer has data
-                if len(self.audio_buffer) > 0:
-                     self.process_logic()
-                        
+
+            if (self.idle_unload_after is not None and self.paused_since is not None
+                    and self.model is not None and now - self.paused_since > self.idle_unload_after):
+                self.unload_model()
+
+            if force_process or now - self.last_process_time > self.transcription_interval:
+                self.tick()
                 self.last_process_time = now
 
+    def set_paused(self, paused: bool):
+        """
+        Called when dictation is toggled. Pausing starts the idle clock;
+        resuming reloads an evicted model in the background right away, while
+        incoming audio keeps buffering so nothing said meanwhile is lost.
+        """
+        with self._model_lock:
+            if paused:
+                self.paused_since = time.time()
+                return
+
+            self.paused_since = None
+            if self.model_evicted and not self.reloading:
+                self.reloading = True
+                threading.Thread(target=self._reload_model, args=(time.perf_counter(),), daemon=True).start()
+
+    def unload_model(self):
+        """Releases the main model (RAM/VRAM) while dictation is paused."""
+        with self._model_lock:
+            if self.paused_since is None:
+                return  # Resumed while we were deciding
+            print(f"Idle for {self.idle_unload_after:.0f}s, unloading model {self.model_size}.")
+            self.model = None
+            self.model_evicted = True
+        # CTranslate2 frees device memory when the last reference goes away
+        gc.collect()
+
+    def _reload_model(self, requested_at: float):
+        """
+        Background reload after resume. A failure plays ERROR once, then retries
+        a few times; if every try fails the model stays evicted and the next
+        resume tries again.
+        """
+        try:
+            for attempt in range(1, self.reload_attempts + 1):
+                try:
+                    # No CPU fallback: a transient CUDA OOM at resume must not
+                    # silently move the rest of the session to a CPU int8 model
+                    model = self._load_model(fallback=False)
+                except Exception as e:
+                    self.last_reload_error = str(e)
+                    print(f"Error reloading model on {self.device} (attempt {attempt}/{self.reload_attempts}): {e}")
+                    if attempt == 1 and self.on_feedback_callback:
+                        self.on_feedback_callback("ERROR")
+                    if attempt == self.reload_attempts or self.paused_since is not None:
+                        break  # Out of tries, or paused again: the next resume retries
+                    time.sleep(self.reload_retry_delay)
+                    continue
+
+                self.model = model
+                self.model_evicted = False
+                self.last_reload_error = None
+                self.last_reload_latency = time.perf_counter() - requested_at
+                print(f"Model reloaded in {self.last_reload_latency:.2f}s.")
+                return
+
+            print("Model reload failed; dictation is unavailable until the next resume.")
+        finally:
+            self.reloading = False
+
+    def ingest(self, new_data: np.ndarray):
+        """Appends flattened audio to the buffer and updates the energy gate."""
+        self.audio_buffer = np.concatenate((self.audio_buffer, new_data))
+
+        if len(new_data) > 0:
+            self.buffer_energy = float(np.sqrt(np.mean(new_data * new_data)))
+            if self.buffer_energy > self.vad_threshold:
+                self.has_speech = True
+
+    def _on_spotted(self, command: str):
+        """
+        Early command path, called on the spotter thread: feedback fires now,
+        the full decode runs right away to confirm and extract the text to commit.
+        """
+        print(f"Spotted: {command} ({self.keyword_spotter.last_latency * 1000:.0f} ms)")
+        self.spotted_command = command
+        self.force_process = True
+        if self.on_feedback_callback:
+            self.on_feedback_callback(self.FEEDBACK[command])
+
+    def tick(self):
+        """One transcription interval. Separated from run() so tools can drive it on simulated time."""
+        # Only process if buffer has data, and don't spend a decode on pure silence
+        if len(self.audio_buffer) > 0:
+            if not self.has_speech:
+                self.skipped_decode_count += 1
+                pre_roll_samples = int(self.pre_roll * self.sample_rate)
+                if len(self.audio_buffer) > pre_roll_samples:
+                    self.audio_buffer = self.audio_buffer[-pre_roll_samples:]
+            elif self.model is not None:
+                self.process_logic()
+            elif len(self.audio_buffer) > self.max_buffer_size:
+                # Evicted or reloading: keep buffering until the model is back,
+                # but only the newest max_buffer_size samples if it never comes
+                self.audio_buffer = self.audio_buffer[-self.max_buffer_size:]
+
+    def _clear_buffer(self):
+        self.audio_buffer = np.array([], dtype=np.float32)
+        self.last_partial_text = ""
+        self.has_speech = False
+
+    def _confirm_command(self, command: str, spotted: Optional[str]):
+        """
+        Fires feedback for a decoded command unless the spotter already did.
+        A different spotted command gets retracted with ERROR first.
+        """
+        # The command's audio is consumed; don't let the spotter fire on it at the next pause.
+        # Reset first: once it returns, any spot of this audio has already been posted
+        if self.keyword_spotter:
+            self.keyword_spotter.reset()
+
+        # A spot posted while this decode ran heard the same audio
+        late = self.spotted_command
+        self.spotted_command = None
+        for heard in {spotted, late} - {None, command}:
+            self._reject_spotted(heard)
+        if command not in (spotted, late) and self.on_feedback_callback:
+            self.on_feedback_callback(self.FEEDBACK[command])
+
+    def _reject_spotted(self, spotted: Optional[str]):
+        """The full decode didn't confirm what the spotter heard: tell the user."""
+        if spotted:
+            print(f"Spotted {spotted} not confirmed by decode")
+            if self.on_feedback_callback:
+                self.on_feedback_callback("ERROR")
+
+    def _transcribe(self, word_timestamps: bool):
+        """
+        Decodes the buffer and yields segments lazily, dropping low-confidence
+        and no-speech segments as they come off the decoder. The wall time from
+        the call until the segments are exhausted lands in decode_costs.
+        """
+        start = time.perf_counter()
+        samples = len(self.audio_buffer)
+        segments, info = self.model.transcribe(
+            self.audio_buffer,
+            beam_size=5,
+            language="en",
+            initial_prompt="Cyberdeck stream log. Python code.",
+            condition_on_previous_text=False,
+            word_timestamps=word_timestamps
+        )
+        if word_timestamps:
+            self.aligned_decode_count += 1
+        try:
+            for s in segments:
+                if s.avg_logprob < self.min_logprob:
+                    # Low confidence; with a high no_speech_prob too, it's silence
+                    self.rejected_segment_count += 1
+                    if s.no_speech_prob > self.min_no_speech_prob:
+                        self.no_speech_segment_count += 1
+                    continue
+                yield s
+        finally:
+            self.decode_costs[word_timestamps].append((time.perf_counter() - start, samples))
+
+    def decode_stats(self, word_timestamps: bool) -> dict:
+        """Per-decode cost summary for plain or aligned decodes. `rtf` is decode time / audio time."""
+        costs = self.decode_costs[word_timestamps]
+        if not costs:
+            return {"decodes": 0, "mean_ms": 0.0, "p95_ms": 0.0, "rtf": 0.0}
+        seconds = np.array([c for c, _ in costs])
+        samples = sum(n for _, n in costs)
+        return {
+            "decodes": len(seconds),
+            "mean_ms": float(seconds.mean() * 1000),
+            "p95_ms": float(np.percentile(seconds, 95) * 1000),
+            "rtf": float(seconds.sum() / max(samples / self.sample_rate, 1e-9)),
+        }
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return word.strip().lower().translate(PUNCTUATION)
+
+    @staticmethod
+    def _count_trailing_cuts(words_text) -> int:
+        count = 0
+        for word in reversed(words_text):
+            if word != "cut":
+                break
+            count += 1
+        return count
+
     def process_logic(self):
+        self.decode_count += 1
+        spotted = self.spotted_command
+        self.spotted_command = None
         try:
-            # Transcribe with Word Timestamps
-            segments, info = self.model.transcribe(
-                self.audio_buffer,
-                beam_size=5,
-                language="en",
-                initial_prompt="Cyberdeck stream log. Python code.",
-                condition_on_previous_text=False,
-                word_timestamps=True 
-            )
-            
-            # Flatten words
+            # Plain decode: word alignment is only paid for when a cut needs it
+            segments = self._transcribe(word_timestamps=False)
+
+            # Split kept segments into words, keeping leading spaces so "".join() restores the text
             all_words = []
             for s in segments:
-                if s.words:
-                    all_words.extend(s.words)
+                all_words.extend(WORD_PATTERN.findall(s.text))
             
             if not all_words:
+                self._reject_spotted(spotted)
                 return
 
             # --- Command Parsing ---
             # Create a clean list for string matching
             # Filter out punctuation for command checks
-            words_text = [w.word.strip().lower().translate(str.maketrans('', '', '.,!?')) for w in all_words]
+            words_text = [self._normalize(w) for w in all_words]
             
             trigger_action = None 
             
@@ -159,17 +400,16 @@ class TranscriptionEngine(threading.Thread):
             # Logic Execution
             if trigger_action == "CLEAR":
                 print("Command: CLEAR THIS")
-                if self.on_feedback_callback: self.on_feedback_callback("DELETE")
+                self._confirm_command("CLEAR", spotted)
                 
-                self.audio_buffer = np.array([], dtype=np.float32)
-                self.last_partial_text = ""
+                self._clear_buffer()
                 if self.on_segment_callback:
                     self.on_segment_callback("", True) 
                 return
 
             if trigger_action == "INJECT":
                 print("Command: INJECT")
-                if self.on_feedback_callback: self.on_feedback_callback("SUCCESS")
+                self._confirm_command("INJECT", spotted)
                 
                 # find first occurrence
                 try:
@@ -177,8 +417,7 @@ class TranscriptionEngine(threading.Thread):
                 except ValueError:
                     return # Should not happen
 
-                valid_words_objs = all_words[:inject_index]
-                final_text = "".join([w.word for w in valid_words_objs]).strip()
+                final_text = "".join(all_words[:inject_index]).strip()
                 
                 # Prevent empty commit
                 if final_text:
@@ -186,34 +425,41 @@ class TranscriptionEngine(threading.Thread):
                         self.on_segment_callback(final_text, True) 
                 
                 # Clear buffer IMMEDIATELY after commit
-                self.audio_buffer = np.array([], dtype=np.float32)
-                self.last_partial_text = ""
+                self._clear_buffer()
                 return
 
             # Check for "Cut"
-            cut_count = 0
-            i = len(words_text) - 1
-            while i >= 0 and words_text[i] == "cut":
-                cut_count += 1
-                i -= 1
+            cut_count = self._count_trailing_cuts(words_text)
             
+            if cut_count > 0:
+                # Cutting trims audio, so this is the one path that needs word timestamps.
+                # It's a second, separate decode: count it, and count the cuts again on
+                # its own words, since the two beam searches may tokenize differently
+                self.decode_count += 1
+                aligned_words = []
+                for s in self._transcribe(word_timestamps=True):
+                    if s.words:
+                        aligned_words.extend(s.words)
+                cut_count = self._count_trailing_cuts([self._normalize(w.word) for w in aligned_words])
+                if not cut_count:
+                    print("Command: CUT not confirmed by aligned decode")
+
             if cut_count > 0:
                 print(f"Command: CUT ({cut_count})")
-                if self.on_feedback_callback: self.on_feedback_callback("DELETE")
+                self._confirm_command("CUT", spotted)
 
                 # Remove 'cut' words themselves + 'cut_count' words before them
                 total_to_remove = cut_count * 2
-                target_len = len(all_words) - total_to_remove
+                target_len = len(aligned_words) - total_to_remove
                 
                 if target_len <= 0:
                     # Clear all
-                    self.audio_buffer = np.array([], dtype=np.float32)
-                    self.last_partial_text = ""
+                    self._clear_buffer()
                     if self.on_segment_callback:
                         self.on_segment_callback("", False)
                     return
                 else:
-                    last_kept_word = all_words[target_len - 1]
+                    last_kept_word = aligned_words[target_len - 1]
                     cut_time = last_kept_word.end
                     
                     # Convert time to samples
@@ -225,7 +471,7 @@ class TranscriptionEngine(threading.Thread):
                          self.audio_buffer = self.audio_buffer[:new_sample_count]
                          
                          # Update partial immediately
-                         valid_words_objs = all_words[:target_len]
+                         valid_words_objs = aligned_words[:target_len]
                          text = "".join([w.word for w in valid_words_objs]).strip()
                          
                          if text != self.last_partial_text:
@@ -235,14 +481,18 @@ class TranscriptionEngine(threading.Thread):
                          return
 
             # Normal Partial Update
-            valid_words_objs = []
+            if not cut_count:
+                self._reject_spotted(spotted)
+
+            valid_words = []
             for i, w in enumerate(all_words):
                 wt = words_text[i]
                 if wt in self.banned_phrases:
+                    self.banned_word_count += 1
                     continue
-                valid_words_objs.append(w)
+                valid_words.append(w)
             
-            text = "".join([w.word for w in valid_words_objs]).strip()
+            text = "".join(valid_words).strip()
             
             if text != self.last_partial_text:
                 self.last_partial_text = text
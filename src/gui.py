@@ -2,57 +2,17 @@ import sys
 import platform
 import ctypes
 import random
-import numpy as np
-import sounddevice as sd
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QLabel, QVBoxLayout, 
                              QWidget, QSystemTrayIcon, QMenu, QGraphicsDropShadowEffect)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QPropertyAnimation, QEasingCurve, QRect
 from PyQt6.QtGui import QAction, QIcon, QFont, QColor, QPalette, QLinearGradient, QBrush, QPainter
 
+from src.sound import SoundSynthesizer
+
 class SignalHandler(QObject):
     update_text = pyqtSignal(str, bool) # text, is_final
     trigger_feedback = pyqtSignal(str)  # "SUCCESS", "ERROR", "DELETE"
-
-class SoundSynthesizer:
-    @staticmethod
-    def generate_tone(freq_start, freq_end, duration, volume=0.5):
-        sample_rate = 44100
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        
-        # Frequency slide
-        freqs = np.linspace(freq_start, freq_end, len(t))
-        
-        # Generate sine wave
-        audio = np.sin(2 * np.pi * freqs * t) * volume
-        
-        # Apply envelope (fade in/out) to avoid clicks
-        envelope = np.ones_like(audio)
-        fade_len = int(sample_rate * 0.01) # 10ms
-        envelope[:fade_len] = np.linspace(0, 1, fade_len)
-        envelope[-fade_len:] = np.linspace(1, 0, fade_len)
-        
-        return (audio * envelope).astype(np.float32)
-
-    @staticmethod
-    def play(sound_type):
-        try:
-            if sound_type == "SUCCESS":
-                # High pitch chirp: 880Hz -> 1760Hz, 100ms
-                wave = SoundSynthesizer.generate_tone(880, 1760, 0.1, 0.3)
-                sd.play(wave, 44100, blocking=False)
-            
-            elif sound_type == "DELETE":
-                # Low decay: 400Hz -> 100Hz, 150ms
-                wave = SoundSynthesizer.generate_tone(400, 100, 0.15, 0.4)
-                sd.play(wave, 44100, blocking=False)
-                
-            elif sound_type == "ERROR":
-                # Buzzer: 150Hz tone
-                wave = SoundSynthesizer.generate_tone(150, 140, 0.2, 0.4)
-                sd.play(wave, 44100, blocking=False)
-                
-        except Exception as e:
-            print(f"Sound Error: {e}")
+    notify = pyqtSignal(str)            # Tray notification text
 
 class AudioVisualizer(QWidget):
     """
@@ -270,9 +230,10 @@ class OverlayWindow(QMainWindow):
             self.visualizer.start_anim()
 
 class SystemTrayApp:
-    def __init__(self, app: QApplication, on_quit: callable):
+    def __init__(self, app: QApplication, on_quit: callable, on_profile: callable = None):
         self.app = app
         self.on_quit = on_quit
+        self.on_profile = on_profile
         
         self.tray_icon = QSystemTrayIcon(QIcon.fromTheme("audio-input-microphone"), self.app)
         self.menu = QMenu()
@@ -285,6 +246,12 @@ class SystemTrayApp:
         action_hide.triggered.connect(self.hide_overlay)
         self.menu.addAction(action_hide)
         
+        if self.on_profile:
+            self.menu.addSeparator()
+            action_profile = QAction("Profile (30s)", self.app)
+            action_profile.triggered.connect(self.on_profile)
+            self.menu.addAction(action_profile)
+
         self.menu.addSeparator()
         
         action_quit = QAction("Terminate", self.app)
@@ -304,6 +271,9 @@ class SystemTrayApp:
     def hide_overlay(self):
         self.overlay.hide()
 
+    def notify(self, message: str):
+        self.tray_icon.showMessage("Algospeak", message)
+
     def quit_app(self):
         self.on_quit()
         self.app.quit()
@@ -1,62 +1,132 @@
+import collections
+import queue
 import threading
 import time
 import pyautogui
 import pyperclip
 from pynput import keyboard
-from typing import Callable, Optional, Set
+from typing import Callable, Optional
 import platform
 
+# Spoken phrases that inject_text turns into key presses instead of typing (keep in sync)
+KEY_COMMANDS = {"delete", "backspace", "enter", "return", "clear line"}
+
+# Modifier bits for the hotkey state machine. One bit per physical key so
+# releasing ctrl_r doesn't forget that ctrl_l is still held.
+_MODIFIER_BITS = {
+    keyboard.Key.ctrl: 1, keyboard.Key.ctrl_l: 2, keyboard.Key.ctrl_r: 4,
+    keyboard.Key.alt: 8, keyboard.Key.alt_l: 16, keyboard.Key.alt_r: 32,
+}
+_CTRL_MASK = 1 | 2 | 4
+_ALT_MASK = 8 | 16 | 32
+
 class InputController:
     def __init__(self, 
                  on_toggle_record: Optional[Callable[[], None]] = None,
-                 on_kill_app: Optional[Callable[[], None]] = None):
+                 on_kill_app: Optional[Callable[[], None]] = None,
+                 on_profile: Optional[Callable[[], None]] = None):
         self.on_toggle_record = on_toggle_record
         self.on_kill_app = on_kill_app
+        self.on_profile = on_profile
         self.listener = None
-        self.current_keys: Set[keyboard.Key] = set()
-        
-        self.HOTKEY_TOGGLE = {keyboard.Key.pause}
-        # Ctrl+Alt+Esc using sets is tricky with pynput's canonicalization
-        # We'll use a simplified check
+
+        self.HOTKEY_TOGGLE = keyboard.Key.pause
+        self.compile_hotkeys()
+
+        # Hotkey state: held modifiers as a bitmask, and the action that last fired
+        # (its key must be released before it fires again, so auto-repeat doesn't re-toggle)
+        self._held = 0
+        self._latched = None
+
+        # Our own keystrokes: > 0 while they're being sent, and ignored until
+        # _suppress_until (monotonic) after the last one (see inject_text)
+        self._suppress = 0
+        self._suppress_until = 0.0
+        self._suppress_lock = threading.Lock()
+
+    def compile_hotkeys(self):
+        """
+        Builds the lookup tables used per key event. Call again after changing
+        HOTKEY_TOGGLE or the callbacks.
+        """
+        self._key_actions = {self.HOTKEY_TOGGLE: "on_toggle_record"}   # Special keys, no modifiers
+        self._combo_key_actions = {keyboard.Key.esc: "on_kill_app"}    # Ctrl+Alt + special key
+        # Ctrl+Alt + character. With Ctrl held some platforms report the control character.
+        self._combo_char_actions = {"p": "on_profile", "P": "on_profile", "\x10": "on_profile"}
+        self._combo_actions = frozenset(self._combo_key_actions.values()) | frozenset(self._combo_char_actions.values())
         
     def start(self):
         self.listener = keyboard.Listener(
             on_press=self.on_press,
             on_release=self.on_release
         )
+        self.listener.name = "HotkeyListener"  # Shows up by name in profiles
         self.listener.start()
 
     def stop(self):
         if self.listener:
             self.listener.stop()
 
-    def on_press(self, key):
-        try:
-            self.current_keys.add(key)
-            
-            # Toggle (Pause/Break)
-            if keyboard.Key.pause in self.current_keys:
-                if self.on_toggle_record:
-                    self.on_toggle_record()
-                self.current_keys.clear()
-
-            # Kill Switch (Ctrl+Alt+Esc) -> Relaxed
-            ctrl_pressed = any(k in self.current_keys for k in {keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r})
-            alt_pressed = any(k in self.current_keys for k in {keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r})
-            
-            if ctrl_pressed and alt_pressed and (keyboard.Key.esc in self.current_keys):
-                if self.on_kill_app:
-                    self.on_kill_app()
-                self.current_keys.clear()
-        except AttributeError:
-             pass
-
-    def on_release(self, key):
-        try:
-            if key in self.current_keys:
-                self.current_keys.remove(key)
-        except KeyError:
-            pass
+    def on_press(self, key, injected: bool = False):
+        """
+        Runs for every keystroke system-wide: constant work, no allocation.
+        `injected` is passed by pynput >= 1.8 for synthetic events.
+        """
+        if injected or key is None:
+            return
+
+        held = self._held
+        if key.__class__ is keyboard.Key:
+            bit = _MODIFIER_BITS.get(key, 0)
+            if bit:
+                # Our own Ctrl+V must not arm Ctrl+Alt combos
+                if not self._suppressed():
+                    self._held = held | bit
+                return
+            action = self._key_actions.get(key)
+            if action is None and held & _CTRL_MASK and held & _ALT_MASK:
+                action = self._combo_key_actions.get(key)
+        elif held & _CTRL_MASK and held & _ALT_MASK and not self._suppressed():
+            action = self._combo_char_actions.get(getattr(key, "char", None))
+        else:
+            return
+
+        if action is None or action is self._latched:
+            return
+        self._latched = action
+        callback = getattr(self, action)
+        if callback:
+            callback()
+
+    def on_release(self, key, injected: bool = False):
+        # Releases only clear state, so they're safe to handle even when synthetic.
+        # The latch is matched by action, not key: with Ctrl held a platform may
+        # report 'p' on press and '\x10' on release.
+        latched = self._latched
+        if key.__class__ is keyboard.Key:
+            bit = _MODIFIER_BITS.get(key, 0)
+            if bit:
+                self._held &= ~bit
+                # A combo also ends when its modifiers go up
+                if latched in self._combo_actions:
+                    self._latched = None
+            elif latched is not None and (self._key_actions.get(key) is latched
+                                          or self._combo_key_actions.get(key) is latched):
+                self._latched = None
+        elif latched is not None and self._combo_char_actions.get(getattr(key, "char", None)) is latched:
+            self._latched = None
+
+    def _suppressed(self) -> bool:
+        return self._suppress > 0 or time.monotonic() < self._suppress_until
+
+    def _begin_suppress(self):
+        with self._suppress_lock:
+            self._suppress += 1
+
+    def _end_suppress(self, tail: float = 0.05):
+        with self._suppress_lock:
+            self._suppress -= 1
+            self._suppress_until = max(self._suppress_until, time.monotonic() + tail)
 
     def inject_text(self, text: str):
         """
@@ -65,8 +135,15 @@ class InputController:
         if not text:
             return
 
-        text = text.strip()
-        
+        # The OS delivers our synthetic keystrokes to the listener asynchronously,
+        # so _end_suppress keeps ignoring them for a moment after the last one is sent
+        self._begin_suppress()
+        try:
+            self._send(text.strip())
+        finally:
+            self._end_suppress()
+
+    def _send(self, text: str):
         # Check for commands
         lower_text = text.lower()
         if lower_text in ["delete", "backspace"]:
@@ -109,3 +186,173 @@ class InputController:
                 pyautogui.hotkey("ctrl", "v")
         except Exception as e:
             print(f"Paste failed: {e}")
+
+
+_window_probe = threading.local()
+
+def active_window_id() -> Optional[int]:
+    """
+    Cheap id of the focused window, or None where we have no cheap way to ask.
+    Windows: GetForegroundWindow. Linux/X11: input focus via python-xlib (a
+    pynput dependency), one display connection per calling thread. A thread
+    that couldn't open the display doesn't try again.
+    """
+    try:
+        system = platform.system()
+        if system == "Windows":
+            import ctypes
+            return ctypes.windll.user32.GetForegroundWindow()
+        if system == "Linux":
+            if not hasattr(_window_probe, "display"):
+                _window_probe.display = None  # Stays None if opening fails (no X, Wayland-only)
+                from Xlib import display
+                _window_probe.display = display.Display()
+            if _window_probe.display is None:
+                return None
+            focus = _window_probe.display.get_input_focus().focus
+            return getattr(focus, "id", None)
+    except Exception:
+        pass
+    return None
+
+
+class FocusTracker(threading.Thread):
+    """
+    Keeps the focused window id in `window` by polling active_window_id() on
+    its own thread, so the engine thread can read it at commit time without an
+    X round-trip. Exits if the display can't be opened.
+    """
+    def __init__(self, interval: float = 0.05):
+        super().__init__(name="FocusTracker", daemon=True)
+        self.interval = interval
+        self.window: Optional[int] = None
+        self.running = True
+
+    def run(self):
+        self.window = active_window_id()
+        if getattr(_window_probe, "display", None) is None:
+            return  # No X display: nothing to track
+        while self.running:
+            time.sleep(self.interval)
+            self.window = active_window_id()
+
+    def stop(self):
+        self.running = False
+
+
+class InjectionWorker(threading.Thread):
+    """
+    Delivers committed text off the engine thread.
+    Commits are injected in order. Consecutive plain-text commits that queue up
+    behind a slow injection are coalesced into one. Before typing, waits (bounded)
+    for the window that was focused at commit time to be focused again.
+    Windows probes focus in submit() (GetForegroundWindow is cheap); X11 reads
+    the id cached by a FocusTracker.
+    """
+    def __init__(self,
+                 inject: Callable[[str], None],
+                 window_wait: float = 0.5,
+                 history: int = 200):
+        super().__init__(name="InjectionWorker", daemon=True)
+        self.inject = inject
+        self.window_wait = window_wait
+        self.queue = queue.Queue()
+        self.running = True
+
+        # Metrics: (queued seconds, inject seconds, chars) per delivered injection
+        self.latencies = collections.deque(maxlen=history)
+        self.coalesced_count = 0
+        self.window_timeouts = 0
+
+        self.focus_tracker = FocusTracker() if platform.system() == "Linux" else None
+
+    def start(self):
+        if self.focus_tracker:
+            self.focus_tracker.start()
+        super().start()
+
+    def submit(self, text: str):
+        """Non-blocking. Called from the engine thread."""
+        if self.focus_tracker:
+            window = self.focus_tracker.window
+        else:
+            window = active_window_id()  # GetForegroundWindow, or None off Windows
+        self.queue.put((text, time.perf_counter(), window))
+
+    def run(self):
+        while self.running:
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for text, enqueued_at, window in self._coalesce(batch):
+                self._deliver(text, enqueued_at, window)
+
+    def _coalesce(self, batch):
+        merged = []
+        for text, enqueued_at, window in batch:
+            if (merged and window == merged[-1][2]
+                    and not self._is_command(text) and not self._is_command(merged[-1][0])):
+                prev_text, prev_enqueued, _ = merged[-1]
+                text = text.strip()
+                # Same spacing rule inject_text applies between separate injections
+                sep = " " if text[:1].isalnum() else ""
+                merged[-1] = (prev_text.strip() + sep + text, prev_enqueued, window)
+                self.coalesced_count += 1
+            else:
+                merged.append((text, enqueued_at, window))
+        return merged
+
+    @staticmethod
+    def _is_command(text: str) -> bool:
+        return text.strip().lower() in KEY_COMMANDS
+
+    def _wait_for_window(self, window: Optional[int]):
+        if window is None:
+            return
+        deadline = time.perf_counter() + self.window_wait
+        while active_window_id() != window:
+            if time.perf_counter() > deadline:
+                self.window_timeouts += 1
+                print("Target window not focused, injecting into the current one.")
+                return
+            time.sleep(0.02)
+
+    def _deliver(self, text: str, enqueued_at: float, window: Optional[int]):
+        self._wait_for_window(window)
+        start = time.perf_counter()
+        try:
+            self.inject(text)
+        except Exception as e:
+            print(f"Injection failed: {e}")
+            return
+        done = time.perf_counter()
+        self.latencies.append((start - enqueued_at, done - start, len(text)))
+        print(f"Injected {len(text)} chars in {(done - start) * 1000:.0f} ms (queued {(start - enqueued_at) * 1000:.0f} ms)")
+
+    def stats(self) -> dict:
+        if not self.latencies:
+            return {"injections": 0, "coalesced": self.coalesced_count, "window_timeouts": self.window_timeouts}
+        queued = sorted(q for q, _, _ in self.latencies)
+        injecting = sorted(i for _, i, _ in self.latencies)
+        p95 = lambda xs: xs[min(len(xs) - 1, int(len(xs) * 0.95))]
+        return {
+            "injections": len(self.latencies),
+            "coalesced": self.coalesced_count,
+            "window_timeouts": self.window_timeouts,
+            "queued_ms_mean": sum(queued) / len(queued) * 1000,
+            "queued_ms_p95": p95(queued) * 1000,
+            "inject_ms_mean": sum(injecting) / len(injecting) * 1000,
+            "inject_ms_p95": p95(injecting) * 1000,
+        }
+
+    def stop(self):
+        self.running = False
+        if self.focus_tracker:
+            self.focus_tracker.stop()
@@ -0,0 +1,177 @@
+import collections
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+
+class KeywordSpotter(threading.Thread):
+    """
+    Streaming spotter for the fixed command vocabulary ("inject", "cut", "clear this").
+
+    Runs on its own thread, fed by the audio bridge alongside the engine.
+    Frame energies are tracked on the raw stream. When speech is followed by a
+    short pause, only the tail of the utterance is decoded with a tiny greedy
+    Whisper model, and the result is matched against the command list. This
+    lets command feedback fire at the end of the word instead of after the
+    next interval plus a full beam-5 decode of the whole buffer, and the spot
+    never waits for (or delays) a decode on the engine thread.
+    """
+    COMMANDS = {
+        ("clear", "this"): "CLEAR",
+        ("inject",): "INJECT",
+        ("cut",): "CUT",
+    }
+
+    def __init__(self,
+                 model_size: str = "tiny.en",
+                 device: str = "cpu",
+                 compute_type: str = "int8",
+                 sample_rate: int = 16000,
+                 energy_threshold: float = 0.008,
+                 end_silence: float = 0.2,     # Pause that marks the end of a command word
+                 min_speech: float = 0.15,     # Ignore clicks and pops
+                 window: float = 1.2,          # Tail of the utterance that gets decoded
+                 on_spotted: Optional[Callable[[str], None]] = None):
+        super().__init__(name="KeywordSpotter", daemon=True)
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.frame_size = int(0.02 * sample_rate)
+        self.end_silence_frames = int(end_silence / 0.02)
+        self.min_speech_frames = int(min_speech / 0.02)
+        self.window_samples = int(window * sample_rate)
+        self.on_spotted = on_spotted
+        self.model = None
+        self.audio_queue = queue.Queue()
+        self.running = True
+
+        self.last_latency = 0.0  # Seconds spent in the last spotting decode
+        self.generation = 0      # Bumped by reset(); a spot from an older generation is dropped
+        self._seen_generation = 0
+        self._spot_generation = 0
+        self._lock = threading.Lock()
+        self._clear()
+
+    def load(self):
+        # Imported here so the module stays importable without faster-whisper
+        from faster_whisper import WhisperModel
+        print(f"Loading keyword spotter {self.model_size} on {self.device}...")
+        self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+
+    def run(self):
+        try:
+            self.load()
+        except Exception as e:
+            print(f"Error loading keyword spotter: {e}")
+            return
+
+        while self.running:
+            try:
+                chunk = self.audio_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if self._seen_generation != self.generation:
+                self._seen_generation = self.generation
+                self._clear()
+            command = self.feed(chunk.flatten())
+            if command and self.on_spotted:
+                # reset() takes the same lock, so once it returns nothing it
+                # cleared can be posted any more
+                with self._lock:
+                    if self._spot_generation == self.generation:
+                        self.on_spotted(command)
+
+    def push_audio(self, audio_data: np.ndarray):
+        """Called from the audio bridge. Dropped until the model is loaded."""
+        if self.model is not None:
+            self.audio_queue.put(audio_data)
+
+    def reset(self):
+        """
+        Thread-safe: forgets everything heard so far. Takes effect before the
+        next chunk, and discards a spot whose decode is already in flight.
+        """
+        with self._lock:
+            self.generation += 1
+
+    def _clear(self):
+        self.ring = collections.deque()
+        self.ring_len = 0
+        self.remainder = np.array([], dtype=np.float32)
+        self.speech_frames = 0
+        self.silence_frames = 0
+
+    def feed(self, audio: np.ndarray) -> Optional[str]:
+        """
+        Consumes mono float32 audio. Returns "INJECT", "CUT" or "CLEAR" when a
+        command ends in this chunk, otherwise None.
+        """
+        if self.model is None or len(audio) == 0:
+            return None
+
+        self.ring.append(audio)
+        self.ring_len += len(audio)
+        while self.ring_len - len(self.ring[0]) >= self.window_samples:
+            self.ring_len -= len(self.ring.popleft())
+
+        # Per-frame RMS over whole 20 ms frames
+        data = np.concatenate((self.remainder, audio))
+        n_frames = len(data) // self.frame_size
+        self.remainder = data[n_frames * self.frame_size:]
+        if n_frames == 0:
+            return None
+        frames = data[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        voiced = np.sqrt(np.mean(frames * frames, axis=1)) > self.energy_threshold
+
+        triggered = False
+        for is_voiced in voiced:
+            if is_voiced:
+                self.speech_frames += 1
+                self.silence_frames = 0
+            else:
+                self.silence_frames += 1
+                if self.silence_frames == self.end_silence_frames and self.speech_frames >= self.min_speech_frames:
+                    triggered = True
+                    self.speech_frames = 0
+
+        if not triggered:
+            return None
+        return self._spot()
+
+    def _spot(self) -> Optional[str]:
+        tail = np.concatenate(self.ring)[-self.window_samples:]
+        generation = self._spot_generation = self.generation
+        start = time.perf_counter()
+        try:
+            segments, _ = self.model.transcribe(
+                tail,
+                beam_size=1,
+                language="en",
+                condition_on_previous_text=False,
+                without_timestamps=True,
+            )
+            text = " ".join(s.text for s in segments)
+        except Exception as e:
+            print(f"Keyword Spotter Error: {e}")
+            return None
+        finally:
+            self.last_latency = time.perf_counter() - start
+
+        if generation != self.generation:
+            return None  # The engine consumed this audio while we were decoding
+
+        words = text.lower().translate(str.maketrans('', '', '.,!?')).split()
+        for phrase, command in self.COMMANDS.items():
+            if tuple(words[-len(phrase):]) == phrase:
+                # Don't let the same audio trigger again on the next pause
+                self._clear()
+                return command
+        return None
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,129 @@
+import collections
+import linecache
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "algospeak_profiles")
+
+
+class SamplingProfiler(threading.Thread):
+    """
+    Low-overhead wall-clock sampler for every Python thread (engine, audio
+    bridge, hotkey listener, Qt main thread). Polls sys._current_frames()
+    every `interval` seconds for `duration` seconds, then writes:
+
+      <stamp>.folded   collapsed stacks, one "thread;frame;frame count" per line
+                       (feed to flamegraph.pl or speedscope)
+      <stamp>.txt      per-thread summary: time in the main model's transcribe,
+                       idle/blocked, and other Python
+    """
+    # Samples under this frame count as "inside the model": the engine's WhisperModel.transcribe
+    # call and the lazy segment decoding it drives. The spotter's tiny model is not on this path.
+    MODEL_FRAME = ("engine.py", "_transcribe")
+    # A leaf frame on a line like these is blocked in C (sleep, lock, queue, socket, Qt loop)
+    IDLE_FUNCTIONS = {("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+                      ("queue.py", "get"), ("selectors.py", "select"), ("socket.py", "accept")}
+    IDLE_LINE = re.compile(r"\bsleep\(|\.wait\(|\.join\(|\.accept\(|\.recv\(|\.select\(|\.get\(timeout|\.exec\(")
+
+    def __init__(self,
+                 duration: float = 30.0,
+                 interval: float = 0.005,
+                 output_dir: str = DEFAULT_OUTPUT_DIR,
+                 on_done: Optional[Callable[[str], None]] = None):
+        super().__init__(name="SamplingProfiler", daemon=True)
+        self.duration = duration
+        self.interval = interval
+        self.output_dir = output_dir
+        self.on_done = on_done
+        self.stacks = collections.Counter()
+        self.thread_samples = collections.Counter()
+        self.model_samples = collections.Counter()
+        self.idle_samples = collections.Counter()
+        self.sample_count = 0
+
+    def run(self):
+        own_id = threading.get_ident()
+        end = time.perf_counter() + self.duration
+        print(f"Profiling all threads for {self.duration:.0f}s...")
+
+        while time.perf_counter() < end:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._record(names.get(thread_id, f"thread-{thread_id}"), frame)
+            self.sample_count += 1
+            time.sleep(self.interval)
+
+        path = self._write()
+        print(f"Profile written to {path}")
+        if self.on_done:
+            self.on_done(path)
+
+    def _record(self, thread_name: str, frame):
+        idle = self._is_idle(frame)
+        stack = []
+        in_model = False
+        while frame is not None:
+            code = frame.f_code
+            name = (os.path.basename(code.co_filename), code.co_name)
+            stack.append(f"{name[0]}:{name[1]}")
+            if name == self.MODEL_FRAME:
+                in_model = True
+            frame = frame.f_back
+
+        stack.append(thread_name)
+        self.stacks[";".join(reversed(stack))] += 1
+        self.thread_samples[thread_name] += 1
+        if in_model:
+            self.model_samples[thread_name] += 1
+        elif idle:
+            self.idle_samples[thread_name] += 1
+
+    def _is_idle(self, leaf) -> bool:
+        """Blocking calls into C don't show up as frames, so look at what the leaf is calling."""
+        code = leaf.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in self.IDLE_FUNCTIONS:
+            return True
+        return bool(self.IDLE_LINE.search(linecache.getline(code.co_filename, leaf.f_lineno)))
+
+    def _write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+
+        with open(base + ".folded", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(base + ".txt", "w") as f:
+            f.write(self.summary())
+        return base + ".folded"
+
+    def summary(self) -> str:
+        lines = [
+            f"Samples: {self.sample_count} over {self.duration:.1f}s (every {self.interval * 1000:.1f} ms)",
+            "",
+            f"{'thread':24s} {'samples':>8s} {'in model':>9s} {'idle':>9s} {'python':>9s}",
+        ]
+        for name, total in self.thread_samples.most_common():
+            model = self.model_samples[name]
+            idle = self.idle_samples[name]
+            lines.append(f"{name:24s} {total:8d} {model / total:9.1%} {idle / total:9.1%} "
+                         f"{(total - model - idle) / total:9.1%}")
+        lines += [
+            "",
+            "'in model' = under the engine's _transcribe (main WhisperModel.transcribe and segment",
+            "decoding, incl. native CTranslate2 calls; not the keyword spotter's tiny model).",
+            "'idle' = sleeping or blocked (sleep, locks, queues, sockets, event loops).",
+            "'python' = everything else.",
+            "",
+            "Top stacks:",
+        ]
+        for stack, count in self.stacks.most_common(15):
+            lines.append(f"  {count:6d}  {stack}")
+        return "\n".join(lines) + "\n"
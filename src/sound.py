@@ -0,0 +1,43 @@
+import numpy as np
+import sounddevice as sd
+
+class SoundSynthesizer:
+    @staticmethod
+    def generate_tone(freq_start, freq_end, duration, volume=0.5):
+        sample_rate = 44100
+        t = np.linspace(0, duration, int(sample_rate * duration), False)
+        
+        # Frequency slide
+        freqs = np.linspace(freq_start, freq_end, len(t))
+        
+        # Generate sine wave
+        audio = np.sin(2 * np.pi * freqs * t) * volume
+        
+        # Apply envelope (fade in/out) to avoid clicks
+        envelope = np.ones_like(audio)
+        fade_len = int(sample_rate * 0.01) # 10ms
+        envelope[:fade_len] = np.linspace(0, 1, fade_len)
+        envelope[-fade_len:] = np.linspace(1, 0, fade_len)
+        
+        return (audio * envelope).astype(np.float32)
+
+    @staticmethod
+    def play(sound_type):
+        try:
+            if sound_type == "SUCCESS":
+                # High pitch chirp: 880Hz -> 1760Hz, 100ms
+                wave = SoundSynthesizer.generate_tone(880, 1760, 0.1, 0.3)
+                sd.play(wave, 44100, blocking=False)
+            
+            elif sound_type == "DELETE":
+                # Low decay: 400Hz -> 100Hz, 150ms
+                wave = SoundSynthesizer.generate_tone(400, 100, 0.15, 0.4)
+                sd.play(wave, 44100, blocking=False)
+                
+            elif sound_type == "ERROR":
+                # Buzzer: 150Hz tone
+                wave = SoundSynthesizer.generate_tone(150, 140, 0.2, 0.4)
+                sd.play(wave, 44100, blocking=False)
+                
+        except Exception as e:
+            print(f"Sound Error: {e}")
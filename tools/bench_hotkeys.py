@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of the global hotkey hook: per-event cost of
+InputController.on_press/on_release under a simulated key stream, against
+the previous set-based implementation. Also checks the hook allocates nothing.
+
+    python tools/bench_hotkeys.py --events 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pynput import keyboard
+
+from src.input import InputController
+
+
+class LegacyHotkeys:
+    """The set-based hook this benchmark is measured against."""
+    def __init__(self):
+        self.current_keys = set()
+
+    def on_press(self, key):
+        try:
+            self.current_keys.add(key)
+            if keyboard.Key.pause in self.current_keys:
+                self.current_keys.clear()
+            ctrl_pressed = any(k in self.current_keys for k in {keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r})
+            alt_pressed = any(k in self.current_keys for k in {keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r})
+            if ctrl_pressed and alt_pressed and (keyboard.Key.esc in self.current_keys):
+                self.current_keys.clear()
+        except AttributeError:
+            pass
+
+    def on_release(self, key):
+        try:
+            if key in self.current_keys:
+                self.current_keys.remove(key)
+        except KeyError:
+            pass
+
+
+def key_stream(n: int, seed: int = 0):
+    """Typing-like stream: mostly characters, some shift/ctrl/backspace, no hotkeys."""
+    rng = random.Random(seed)
+    chars = [keyboard.KeyCode.from_char(c) for c in "abcdefghijklmnopqrstuvwxyz .,"]
+    specials = [keyboard.Key.shift, keyboard.Key.backspace, keyboard.Key.space, keyboard.Key.ctrl_l, keyboard.Key.enter]
+    return [rng.choice(specials) if rng.random() < 0.1 else rng.choice(chars) for _ in range(n)]
+
+
+def measure(on_press, on_release, events, **kwargs) -> float:
+    start = time.perf_counter_ns()
+    for key in events:
+        on_press(key, **kwargs)
+        on_release(key, **kwargs)
+    return (time.perf_counter_ns() - start) / (2 * len(events))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hotkey hook per-event cost.")
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    events = key_stream(args.events)
+    legacy = LegacyHotkeys()
+    controller = InputController(on_toggle_record=lambda: None, on_kill_app=lambda: None)
+
+    # Warm up, then best of 5
+    for _ in range(2):
+        measure(legacy.on_press, legacy.on_release, events[:10000])
+        measure(controller.on_press, controller.on_release, events[:10000])
+
+    legacy_ns = min(measure(legacy.on_press, legacy.on_release, events) for _ in range(5))
+    current_ns = min(measure(controller.on_press, controller.on_release, events) for _ in range(5))
+    injected_ns = min(measure(controller.on_press, controller.on_release, events, injected=True) for _ in range(5))
+
+    controller._begin_suppress()
+    suppressed_ns = min(measure(controller.on_press, controller.on_release, events) for _ in range(5))
+    controller._end_suppress()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    measure(controller.on_press, controller.on_release, events[:20000])
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    hook_file = os.path.join("src", "input.py")
+    allocated = sum(d.size_diff for d in after.compare_to(before, "filename")
+                    if d.traceback[0].filename.endswith(hook_file))
+
+    print(f"{args.events} events (press + release each)")
+    print(f"legacy set-based hook:   {legacy_ns:7.0f} ns/event")
+    print(f"state machine hook:      {current_ns:7.0f} ns/event ({legacy_ns / current_ns:.1f}x faster)")
+    print(f"  injected=True events:  {injected_ns:7.0f} ns/event")
+    print(f"  during own injection:  {suppressed_ns:7.0f} ns/event")
+    print(f"bytes retained by hook:  {allocated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compares the GUI build (main.py) with the headless daemon (headless.py):
+time until the model reports ready, and resident memory at that point.
+Linux only (reads /proc/<pid>/status).
+
+    python tools/bench_startup.py --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = {
+    "gui": [sys.executable, "-u", "main.py"],
+    "headless": [sys.executable, "-u", "headless.py", "--no-hotkeys"],
+}
+
+
+def read_rss_mb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, kb, _ = line.split()
+                values[key.rstrip(":")] = int(kb) / 1024
+    return values
+
+
+def measure(cmd, marker: str, timeout: float) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    ready = threading.Event()     # Marker seen
+    finished = threading.Event()  # Marker seen or output closed
+
+    def watch():
+        # Keep draining after the marker so the child never blocks on a full pipe
+        for line in proc.stdout:
+            if marker in line:
+                ready.set()
+                finished.set()
+        finished.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+    finished.wait(timeout)
+    elapsed = time.perf_counter() - start
+
+    try:
+        if not ready.is_set():
+            if proc.poll() is not None:
+                raise RuntimeError(f"{cmd[2]} exited with code {proc.returncode} before printing {marker!r}")
+            raise RuntimeError(f"{cmd[2]} did not print {marker!r} within {timeout:.0f}s")
+        # Let post-ready allocations (spotter load, Qt first paint) settle
+        time.sleep(2.0)
+        mem = read_rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {"ready_s": elapsed, "rss_mb": mem.get("VmRSS", 0.0), "peak_mb": mem.get("VmHWM", 0.0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI vs headless startup benchmark.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--marker", default="Model loaded.", help="Output line that marks readiness")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    results = {name: [] for name in TARGETS}
+    failures = 0
+    for run in range(args.runs):
+        for name, cmd in TARGETS.items():
+            try:
+                r = measure(cmd, args.marker, args.timeout)
+            except RuntimeError as e:
+                failures += 1
+                print(f"run {run + 1} {name:9s} FAILED: {e}")
+                continue
+            results[name].append(r)
+            print(f"run {run + 1} {name:9s} ready {r['ready_s']:6.2f}s  rss {r['rss_mb']:7.1f} MB  peak {r['peak_mb']:7.1f} MB")
+
+    print()
+    print(f"{'':9s} {'ready (s)':>10s} {'rss (MB)':>10s} {'peak (MB)':>10s}")
+    for name, rows in results.items():
+        if not rows:
+            print(f"{name:9s} {'no successful runs':>32s}")
+            continue
+        print(f"{name:9s} {statistics.median(r['ready_s'] for r in rows):10.2f} "
+              f"{statistics.median(r['rss_mb'] for r in rows):10.1f} "
+              f"{statistics.median(r['peak_mb'] for r in rows):10.1f}")
+
+    if failures:
+        print(f"{failures} run(s) failed; excluded from the medians.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
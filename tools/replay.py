@@ -0,0 +1,112 @@
+"""
+Replay harness: feeds a recorded WAV through the pre-processing stage and the
+TranscriptionEngine on simulated time, then reports decode count and
+hallucination rate, plus per-decode cost for plain and word-aligned decodes.
+Run it with and without DSP to compare:
+
+    python tools/replay.py lab_noise.wav
+    python tools/replay.py lab_noise.wav --no-dsp
+    python tools/replay.py fan_only.wav --expect-silence
+"""
+import argparse
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dsp import PreProcessor
+from src.engine import TranscriptionEngine
+
+
+def load_wav(path: str, sample_rate: int) -> np.ndarray:
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if width == 2:
+        audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bit")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    if rate != sample_rate:
+        # Linear resample is plenty for a benchmark input
+        n_out = int(len(audio) * sample_rate / rate)
+        audio = np.interp(np.linspace(0, len(audio) - 1, n_out), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def replay(audio: np.ndarray, engine: TranscriptionEngine, preprocessor, block_size: int = 1024):
+    """Drives engine.ingest()/tick() as if audio arrived in real time."""
+    interval_samples = int(engine.transcription_interval * engine.sample_rate)
+    since_tick = 0
+
+    for start in range(0, len(audio), block_size):
+        block = audio[start:start + block_size].reshape(-1, 1)
+        if preprocessor:
+            block = preprocessor.process(block)
+        engine.ingest(block.flatten())
+
+        since_tick += block_size
+        if since_tick >= interval_samples:
+            since_tick -= interval_samples
+            engine.tick()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a WAV through the DSP stage and engine.")
+    parser.add_argument("wav")
+    parser.add_argument("--no-dsp", action="store_true", help="Bypass the pre-processing stage")
+    parser.add_argument("--model", default="large-v3-turbo")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--expect-silence", action="store_true",
+                        help="Recording contains no speech: any emitted text counts as hallucination")
+    args = parser.parse_args()
+
+    emitted = []
+
+    def on_segment(text: str, is_final: bool):
+        if text:
+            emitted.append(text)
+
+    engine = TranscriptionEngine(model_size=args.model, device=args.device, on_segment_callback=on_segment)
+    engine.initialize_model()
+
+    preprocessor = None if args.no_dsp else PreProcessor.default(engine.sample_rate)
+    audio = load_wav(args.wav, engine.sample_rate)
+    replay(audio, engine, preprocessor)
+
+    decodes = engine.decode_count
+    hallucinated = engine.banned_word_count
+    if args.expect_silence:
+        hallucinated += sum(len(t.split()) for t in emitted)
+
+    print(f"Audio:          {len(audio) / engine.sample_rate:.1f}s ({'raw' if args.no_dsp else 'pre-processed'})")
+    print(f"Decodes:        {decodes} (skipped {engine.skipped_decode_count} silent intervals)")
+    print(f"Word alignment: {engine.aligned_decode_count} decodes")
+    for label, aligned in (("Plain decode:", False), ("Aligned decode:", True)):
+        stats = engine.decode_stats(aligned)
+        if stats["decodes"]:
+            print(f"{label:15s} mean {stats['mean_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms per decode "
+                  f"(RTF {stats['rtf']:.3f}, {stats['decodes']} decodes)")
+    print(f"Rejected segs:  {engine.rejected_segment_count} ({engine.no_speech_segment_count} no speech, "
+          f"{engine.rejected_segment_count - engine.no_speech_segment_count} low confidence)")
+    print(f"Text updates:   {len(emitted)}")
+    print(f"Hallucinations: {hallucinated} words, {hallucinated / max(decodes, 1):.3f} per decode")
+    if preprocessor:
+        stats = preprocessor.stats()
+        print(f"DSP cost:       mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+              f"max {stats['max_ms']:.2f} ms per block (RTF {stats['rtf']:.4f})")
+
+
+if __name__ == "__main__":
+    main()
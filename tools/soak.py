@@ -0,0 +1,341 @@
+"""
+Soak test: drives the full pipeline (AudioPipeline -> bridge -> TranscriptionEngine
+-> InjectionWorker, feedback sounds, optional Qt signals) with synthetic speech and
+commands for hours of simulated time, using a fake Whisper model and a stand-in
+injection backend. Samples RSS, thread count, queue depths and per-tick latency,
+and exits non-zero if any of them trend upward.
+
+    python tools/soak.py --hours 8 --speed 40
+    python tools/soak.py --hours 1 --speed 10 --qt --sound
+"""
+import argparse
+import collections
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.audio import AudioPipeline
+from src.dsp import PreProcessor
+from src.engine import TranscriptionEngine
+from src.input import InjectionWorker
+from src.kws import KeywordSpotter
+from src.sound import SoundSynthesizer
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1024
+WORD_BLOCKS = 5       # Tone blocks per synthetic word (~0.32 s), followed by one silent block
+PRE_ROLL = 0.5        # Silence ahead of each utterance
+
+VOCABULARY = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+              "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa")
+COMMAND_WORDS = ("inject", "cut", "clear", "this")
+
+# Every word is a pure tone of its own frequency, so the fake models can "hear"
+# exactly what is left in a buffer after cuts and clears
+WORD_FREQS = {w: 200.0 + 100.0 * i for i, w in enumerate(VOCABULARY + COMMAND_WORDS)}
+FREQ_WORDS = np.array(list(WORD_FREQS.values()))
+WORDS_BY_INDEX = list(WORD_FREQS)
+
+FakeWord = collections.namedtuple("FakeWord", "word start end")
+FakeSegment = collections.namedtuple("FakeSegment", "text words avg_logprob no_speech_prob")
+
+
+def next_utterance(rng: random.Random):
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 12))]
+    roll = rng.random()
+    if roll < 0.15:
+        words += ["cut"] * rng.randint(1, 2)
+    elif roll < 0.25:
+        words += ["clear", "this"]
+    else:
+        words.append("inject")
+    return words
+
+
+def hear_words(audio: np.ndarray):
+    """Tone decoder: one word per voiced run, identified by its dominant frequency."""
+    frame = int(0.02 * SAMPLE_RATE)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    frames = np.asarray(audio[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    voiced = np.sqrt(np.mean(frames * frames, axis=1)) > 0.02
+    peak_hz = np.argmax(np.abs(np.fft.rfft(frames, axis=1)), axis=1) * SAMPLE_RATE / frame
+    nearest = np.argmin(np.abs(peak_hz[:, None] - FREQ_WORDS[None, :]), axis=1)
+
+    # Voiced runs: rising and falling edges of the mask
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    words = []
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if end - start < 5:
+            continue  # Too short to be a word (onset/offset smear)
+        index = np.bincount(nearest[start:end]).argmax()
+        words.append(FakeWord(" " + WORDS_BY_INDEX[index], start * 0.02, end * 0.02))
+    return words
+
+
+class FakeWhisperModel:
+    """Stands in for WhisperModel (and the spotter's tiny model) using hear_words()."""
+    def transcribe(self, audio, word_timestamps: bool = False, **kwargs):
+        words = hear_words(audio)
+        segment = FakeSegment("".join(w.word for w in words), words if word_timestamps else None, -0.3, 0.05)
+        return iter([segment] if words else []), None
+
+
+class SoakSpotter(KeywordSpotter):
+    def load(self):
+        self.model = FakeWhisperModel()
+
+
+class SoakEngine(TranscriptionEngine):
+    """Fake model, plus per-tick latency recording."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.tick_latencies = collections.deque(maxlen=10000)
+
+    def _load_model(self, fallback: bool = True):
+        return FakeWhisperModel()
+
+    def tick(self):
+        start = time.perf_counter()
+        super().tick()
+        self.tick_latencies.append(time.perf_counter() - start)
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # No procfs: peak RSS is the best we have (KB on Linux, bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def speaker(pipeline: AudioPipeline, engine: SoakEngine, args, stop: threading.Event, progress: dict):
+    """
+    Plays the role of PortAudio: synthesizes tone-coded speech and calls the
+    pipeline callback at `speed` times real time. Pauses dictation now and then
+    to exercise idle eviction and reload.
+    """
+    rng = np.random.default_rng(args.seed)
+    script_rng = random.Random(args.seed)
+    block_dur = BLOCK_SIZE / SAMPLE_RATE
+    t = np.arange(BLOCK_SIZE) / SAMPLE_RATE
+    next_pause = args.pause_every
+
+    def play(blocks: int, freq: float = 0.0):
+        phase = 0.0
+        for _ in range(blocks):
+            if stop.is_set():
+                return
+            block = rng.normal(0, 0.004, BLOCK_SIZE)
+            if freq:
+                block += 0.1 * np.sin(2 * np.pi * freq * t + phase)
+                phase += 2 * np.pi * freq * block_dur
+            pipeline._callback(block.astype(np.float32).reshape(-1, 1), BLOCK_SIZE, None, None)
+            progress["simulated"] += block_dur
+            time.sleep(block_dur / args.speed)
+
+    def silence(seconds: float):
+        play(max(1, int(round(seconds / block_dur))))
+
+    while not stop.is_set():
+        if progress["simulated"] >= next_pause:
+            next_pause += args.pause_every
+            pipeline.is_recording = False
+            engine.set_paused(True)
+            silence(args.pause_length)  # Dropped by the callback while paused
+            engine.set_paused(False)
+            pipeline.reset_preprocessor()
+            pipeline.is_recording = True
+
+        silence(PRE_ROLL)
+        for word in next_utterance(script_rng):
+            play(WORD_BLOCKS, WORD_FREQS[word])
+            play(1)
+        silence(rng.uniform(1.0, 2.5))
+
+
+def trend(values, times):
+    """(slope per hour, first-quarter median, last-quarter median)"""
+    values = np.asarray(values, dtype=np.float64)
+    hours = np.asarray(times, dtype=np.float64) / 3600
+    q = max(1, len(values) // 4)
+    slope = np.polyfit(hours, values, 1)[0] if len(values) > 2 and np.ptp(hours) > 0 else 0.0
+    return slope, float(np.median(values[:q])), float(np.median(values[-q:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running soak test of the full pipeline.")
+    parser.add_argument("--hours", type=float, default=2.0, help="Simulated hours of dictation")
+    parser.add_argument("--speed", type=float, default=20.0, help="Simulated seconds per wall-clock second")
+    parser.add_argument("--sample-every", type=float, default=5.0, help="Wall-clock seconds between samples")
+    parser.add_argument("--pause-every", type=float, default=600.0, help="Simulated seconds between dictation pauses")
+    parser.add_argument("--pause-length", type=float, default=60.0, help="Simulated seconds per pause")
+    parser.add_argument("--qt", action="store_true", help="Route updates through Qt signals (needs PyQt6)")
+    parser.add_argument("--sound", action="store_true", help="Actually play feedback sounds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rss-tolerance", type=float, default=20.0, help="Allowed RSS growth, MB")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="Allowed tick p95 growth, fraction")
+    args = parser.parse_args()
+
+    injected = collections.Counter()
+    feedback = collections.Counter()
+
+    def fake_inject(text: str):
+        # Slow, jittery target app
+        time.sleep(random.uniform(0.005, 0.05) / args.speed)
+        injected["chars"] += len(text)
+
+    injector = InjectionWorker(fake_inject, window_wait=0.0)
+
+    app = None
+    if args.qt:
+        from PyQt6.QtCore import QCoreApplication
+        from src.gui import SignalHandler
+        app = QCoreApplication(sys.argv)
+        signal_handler = SignalHandler()
+        signal_handler.update_text.connect(lambda text, is_final: feedback.update(["update"]))
+        signal_handler.trigger_feedback.connect(lambda kind: on_feedback(kind))
+
+    def on_feedback(kind: str):
+        feedback[kind] += 1
+        if args.sound:
+            SoundSynthesizer.play(kind)
+        else:
+            # Same synthesis work, no audio device
+            SoundSynthesizer.generate_tone(880, 1760, 0.1, 0.3)
+
+    def on_transcription_update(text: str, is_final: bool):
+        if app is not None:
+            signal_handler.update_text.emit(text, is_final)
+        if is_final and text:
+            injector.submit(text)
+
+    def on_feedback_update(kind: str):
+        if app is not None:
+            signal_handler.trigger_feedback.emit(kind)
+        else:
+            on_feedback(kind)
+
+    spotter = SoakSpotter()
+    engine = SoakEngine(
+        on_segment_callback=on_transcription_update,
+        on_feedback_callback=on_feedback_update,
+        keyword_spotter=spotter
+    )
+    engine.transcription_interval /= args.speed
+    engine.idle_unload_after = args.pause_length / 2 / args.speed
+
+    pipeline = AudioPipeline(preprocessor=PreProcessor.default())
+    pipeline.is_recording = True  # No stream: the speaker thread calls _callback directly
+
+    stop = threading.Event()
+    progress = {"simulated": 0.0}
+
+    def audio_bridge():
+        while not stop.is_set():
+            chunk = pipeline.get_audio_chunk()
+            if chunk is not None:
+                engine.push_audio(chunk)
+                spotter.push_audio(chunk)
+            else:
+                time.sleep(0.005)
+
+    engine.start()
+    spotter.start()
+    injector.start()
+    threading.Thread(target=audio_bridge, name="AudioBridge", daemon=True).start()
+    while engine.model is None or spotter.model is None:
+        time.sleep(0.01)
+    threading.Thread(target=speaker, args=(pipeline, engine, args, stop, progress),
+                     name="Speaker", daemon=True).start()
+
+    samples = collections.defaultdict(list)
+    target = args.hours * 3600
+    next_sample = time.perf_counter() + args.sample_every
+    print(f"Soaking {args.hours:.1f} simulated hours at {args.speed:.0f}x "
+          f"(~{target / args.speed / 60:.0f} min wall clock)")
+
+    try:
+        while progress["simulated"] < target:
+            if app is not None:
+                app.processEvents()
+            time.sleep(0.02)
+            if time.perf_counter() < next_sample:
+                continue
+            next_sample += args.sample_every
+
+            ticks = np.array(engine.tick_latencies) if engine.tick_latencies else np.zeros(1)
+            engine.tick_latencies.clear()
+            row = {
+                "rss_mb": rss_mb(),
+                "threads": threading.active_count(),
+                "pipeline_queue": pipeline.audio_queue.qsize(),
+                "engine_queue": engine.audio_queue.qsize(),
+                "spotter_queue": spotter.audio_queue.qsize(),
+                "engine_buffer_s": len(engine.audio_buffer) / SAMPLE_RATE,
+                "inject_queue": injector.queue.qsize(),
+                "tick_p95_ms": float(np.percentile(ticks, 95) * 1000),
+            }
+            samples["t"].append(progress["simulated"])
+            for key, value in row.items():
+                samples[key].append(value)
+            print(f"[{progress['simulated'] / 3600:5.2f}h] " + "  ".join(f"{k}={v:.1f}" for k, v in row.items()))
+    except KeyboardInterrupt:
+        print("Interrupted, evaluating what we have.")
+    finally:
+        stop.set()
+        engine.stop()
+        spotter.stop()
+        injector.stop()
+
+    # Drop the first 10% as warm-up (allocator pools, first model load)
+    skip = len(samples["t"]) // 10
+    times = samples["t"][skip:]
+    limits = {
+        "rss_mb": args.rss_tolerance,
+        "threads": 0.5,
+        "pipeline_queue": 5,
+        "engine_queue": 5,
+        "spotter_queue": 5,
+        "engine_buffer_s": 5.0,
+        "inject_queue": 2,
+    }
+
+    failed = []
+    print()
+    print(f"Decodes {engine.decode_count}, injected {injector.stats()['injections']} commits "
+          f"({injected['chars']} chars), feedback {dict(feedback)}")
+    print(f"{'metric':16s} {'slope/h':>10s} {'first':>10s} {'last':>10s}  verdict")
+    for key in list(limits) + ["tick_p95_ms"]:
+        values = samples[key][skip:]
+        if len(values) < 4:
+            print("Not enough samples for a verdict; run longer or sample more often.")
+            return 2
+        slope, first, last = trend(values, times)
+        # Latency is judged relative to where it started, with a 1 ms floor for timer noise
+        allowed = max(first * args.latency_tolerance, 1.0) if key == "tick_p95_ms" else limits[key]
+        # Upward trend = positive slope AND a real rise between the first and last quarter
+        ok = not (slope > 0 and last - first > allowed)
+        if not ok:
+            failed.append(key)
+        print(f"{key:16s} {slope:10.3f} {first:10.2f} {last:10.2f}  {'ok' if ok else 'GROWING'}")
+
+    if failed:
+        print(f"FAIL: upward trend in {', '.join(failed)}")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())